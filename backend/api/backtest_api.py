@@ -1,12 +1,16 @@
 from datetime import date
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Literal, Optional, List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
 from ..backtest.engine import BacktestEngine
 from ..backtest.metrics import compute_metrics, extract_trades
-from ..data.fetch import get_ohlcv
+from ..backtest.scanner import scan_universe
+from ..backtest.store import data_fingerprint, get_experiment_store
+from ..data.fetch import flatten_columns, get_ohlcv
 from ..strategies.ma_crossover import MACrossover
 from ..strategies.mean_reversion import MeanReversion
 from ..strategies.breakout import Breakout
@@ -26,10 +30,50 @@ class BacktestRequest(BaseModel):
     source: Literal["yfinance", "ccxt"] = "yfinance"
     interval: str = "1d"
     initial_capital: float = 10_000
+    # Also persist equity and trades in the experiment store
+    store_series: bool = False
+
+
+class StrategyConfig(BaseModel):
+    strategy: Literal["ma_crossover", "mean_reversion", "breakout"]
+    params: Dict[str, Any] = {}
+    # Key in the response; defaults to strategy name
+    label: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return self.label or self.strategy
+
+
+class ScanRequest(BaseModel):
+    strategies: List[StrategyConfig] = [
+        StrategyConfig(strategy="ma_crossover"),
+        StrategyConfig(strategy="mean_reversion"),
+        StrategyConfig(strategy="breakout"),
+    ]
+    tickers: Optional[List[str]] = None
+    source: Literal["yfinance", "ccxt"] = "yfinance"
+    interval: str = "1d"
+
+
+class CompareRequest(BaseModel):
+    ticker: str
+    strategies: List[StrategyConfig] = [
+        StrategyConfig(strategy="ma_crossover"),
+        StrategyConfig(strategy="mean_reversion"),
+        StrategyConfig(strategy="breakout"),
+    ]
+    period: Period
+    source: Literal["yfinance", "ccxt"] = "yfinance"
+    interval: str = "1d"
+    initial_capital: float = 10_000
 
 
 router = APIRouter()
 
+# Upper bound on configurations per /compare request
+MAX_COMPARE_STRATEGIES = 20
+
 STRATEGIES_INFO = [
     {
         "name": "ma_crossover",
@@ -79,6 +123,33 @@ def _get_strategy(name: str, params: Dict[str, Any]):
     raise ValueError(f"Unknown strategy: {name}")
 
 
+def _log_run(
+    req,
+    strategy: str,
+    params: Dict[str, Any],
+    n_bars: int,
+    fingerprint: str,
+    metrics: Dict[str, Optional[float]],
+    series: Optional[Dict[str, Any]] = None,
+) -> None:
+    get_experiment_store().log(
+        {
+            "strategy": strategy,
+            "ticker": req.ticker.upper(),
+            "source": req.source,
+            "interval": req.interval,
+            "start": req.period.start.isoformat(),
+            "end": req.period.end.isoformat(),
+            "params": params,
+            "initial_capital": req.initial_capital,
+            "n_bars": n_bars,
+            "data_fingerprint": fingerprint,
+        },
+        metrics,
+        series=series,
+    )
+
+
 @router.post(
     "/run",
     summary="Запуск бэктеста стратегии",
@@ -125,6 +196,16 @@ def run_backtest(req: BacktestRequest):
     else:
         signals = []
 
+    _log_run(
+        req,
+        req.strategy,
+        req.params,
+        len(df),
+        data_fingerprint(df),
+        metrics,
+        series={"labels": labels, "equity": equity, "trades": trades} if req.store_series else None,
+    )
+
     equity_png = equity_plot(equity, labels)
     price_png = price_signals_plot(price, labels, signals) if signals else None
 
@@ -140,3 +221,142 @@ def run_backtest(req: BacktestRequest):
     }
 
 
+@router.post(
+    "/compare",
+    summary="Сравнение нескольких стратегий",
+    description=(
+        "Загружает данные один раз и параллельно прогоняет набор конфигураций стратегий. "
+        "Возвращает выровненные кривые equity и таблицу метрик (без картинок)."
+    ),
+)
+def compare_backtests(req: CompareRequest):
+    keys = [cfg.key for cfg in req.strategies]
+    if not keys:
+        raise HTTPException(status_code=400, detail="No strategies to compare")
+    if len(keys) > MAX_COMPARE_STRATEGIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_COMPARE_STRATEGIES} strategies can be compared at once",
+        )
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Strategy labels must be unique")
+
+    try:
+        strategies = [_get_strategy(cfg.strategy, cfg.params) for cfg in req.strategies]
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    df = get_ohlcv(
+        ticker=req.ticker,
+        start=req.period.start,
+        end=req.period.end,
+        source=req.source,
+        interval=req.interval,
+    )
+    if df.empty:
+        raise HTTPException(status_code=400, detail="No data for given parameters")
+
+    # One slim, flat frame shared read-only by all runs (strategies copy before writing)
+    bars = flatten_columns(df)[["Open", "High", "Low", "Close", "Volume"]]
+    fingerprint = data_fingerprint(bars)
+
+    def _run(strategy) -> tuple:
+        # Each strategy copies bars itself, so the engine-level copy is skipped
+        result_df = BacktestEngine(
+            bars, strategy, initial_capital=req.initial_capital, copy_data=False
+        ).run()
+        metrics = compute_metrics(result_df["Strategy"].dropna(), freq="D")
+        # Same closed-trade count as /run reports
+        n_trades = len(extract_trades(result_df))
+        return result_df["Equity"].to_numpy().tolist(), metrics, n_trades
+
+    with ThreadPoolExecutor(max_workers=min(len(strategies), os.cpu_count() or 4)) as pool:
+        results = list(pool.map(_run, strategies))
+
+    equity = {}
+    metrics = {}
+    for key, cfg, (eq, m, n_trades) in zip(keys, req.strategies, results):
+        equity[key] = eq
+        metrics[key] = {**m, "trades": n_trades}
+        _log_run(req, cfg.strategy, cfg.params, len(bars), fingerprint, m)
+
+    metric_names = list(next(iter(metrics.values())))
+    # Values nested per label so no label can clash with the "metric" column
+    table = [
+        {"metric": name, "values": {key: metrics[key][name] for key in keys}}
+        for name in metric_names
+    ]
+
+    return {
+        "labels": [idx.isoformat() for idx in bars.index],
+        "price": bars["Close"].to_numpy().tolist(),
+        "equity": equity,
+        "metrics": metrics,
+        "table": table,
+    }
+
+
+@router.get(
+    "/experiments",
+    summary="Поиск по истории бэктестов",
+    description=(
+        "Возвращает сохранённые запуски бэктестов, отфильтрованные по стратегии, тикеру и периоду "
+        "и отсортированные по выбранной метрике (например, топ-50 по Sharpe)."
+    ),
+)
+def query_experiments(
+    strategy: Optional[Literal["ma_crossover", "mean_reversion", "breakout"]] = None,
+    ticker: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    order_by: Literal[
+        "sharpe",
+        "sortino",
+        "max_drawdown",
+        "cagr",
+        "volatility",
+        "win_rate",
+        "profit_factor",
+        "created_at",
+    ] = "sharpe",
+    descending: bool = True,
+    limit: int = Query(50, ge=1, le=1000),
+    include_series: bool = False,
+):
+    store = get_experiment_store()
+    # Make runs logged just before this request visible (bounded wait)
+    store.flush()
+    return store.query(
+        strategy=strategy,
+        ticker=ticker,
+        since=since.isoformat() if since else None,
+        until=until.isoformat() if until else None,
+        order_by=order_by,
+        descending=descending,
+        limit=limit,
+        include_series=include_series,
+    )
+
+
+@router.post(
+    "/scan",
+    summary="Сканер сигналов по вселенной тикеров",
+    description=(
+        "Для каждой стратегии возвращает тикеры из кэша, которые сейчас в лонге или только что "
+        "сменили позицию. Читаются только последние бары, необходимые стратегии."
+    ),
+)
+def scan(req: ScanRequest):
+    try:
+        strategies = {
+            cfg.key: _get_strategy(cfg.strategy, cfg.params) for cfg in req.strategies
+        }
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return scan_universe(
+        strategies,
+        source=req.source,
+        interval=req.interval,
+        tickers=req.tickers,
+    )
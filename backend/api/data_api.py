@@ -1,10 +1,19 @@
+import hashlib
+import io
 from datetime import date
-from typing import Literal, Optional, List
+from typing import Iterator, Literal, Optional, List
 
-from fastapi import APIRouter
+import pandas as pd
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from ..data.fetch import get_ohlcv
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional, only needed for Arrow export
+    pa = None
+
+from ..data.fetch import flatten_columns, get_ohlcv
 
 
 class DataRequest(BaseModel):
@@ -58,3 +67,116 @@ def load_data(req: DataRequest):
     }
 
 
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+BAR_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _bars_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize cached OHLCV to flat columns and a UTC "timestamp" column.
+    """
+    df = flatten_columns(df)
+    df = df.loc[:, [c for c in BAR_COLUMNS if c in df.columns]]
+    # Naive indexes (daily yfinance, ccxt) are already UTC; aware ones get converted
+    index = pd.DatetimeIndex(df.index)
+    df = df.set_axis(index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC"))
+    df = df.rename_axis("timestamp").reset_index()
+    return df
+
+
+def _bars_etag(df: pd.DataFrame, key: str) -> str:
+    # Content hash of the bars, so an unchanged range keeps the same ETag
+    digest = hashlib.sha1(key.encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return f'"{digest.hexdigest()}"'
+
+
+def _iter_slices(df: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    for pos in range(0, len(df), chunk_size):
+        yield df.iloc[pos : pos + chunk_size]
+
+
+def _iter_csv(df: pd.DataFrame, chunk_size: int) -> Iterator[bytes]:
+    for i, chunk in enumerate(_iter_slices(df, chunk_size)):
+        yield chunk.to_csv(index=False, header=i == 0, date_format="%Y-%m-%dT%H:%M:%SZ").encode("utf-8")
+
+
+def _iter_ndjson(df: pd.DataFrame, chunk_size: int) -> Iterator[bytes]:
+    for chunk in _iter_slices(df, chunk_size):
+        text = chunk.to_json(orient="records", lines=True, date_format="iso")
+        yield (text.rstrip("\n") + "\n").encode("utf-8")
+
+
+def _iter_arrow(df: pd.DataFrame, chunk_size: int) -> Iterator[bytes]:
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in _iter_slices(df, chunk_size):
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            # Hand out what has been written so far and reuse the buffer
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate(0)
+    # End-of-stream marker written on close
+    yield sink.getvalue()
+
+
+BAR_WRITERS = {
+    "csv": _iter_csv,
+    "ndjson": _iter_ndjson,
+    "arrow": _iter_arrow,
+}
+
+
+@router.get(
+    "/bars",
+    summary="Выгрузить OHLCV-бары из кэша",
+    description=(
+        "Потоково отдаёт закэшированные OHLCV для тикера/периода/интервала в формате "
+        "CSV, NDJSON или Arrow IPC. Поддерживает ETag/If-None-Match."
+    ),
+)
+def get_bars(
+    ticker: str,
+    start: date,
+    end: date,
+    source: Literal["yfinance", "ccxt"] = "yfinance",
+    interval: str = "1d",
+    fmt: Literal["csv", "ndjson", "arrow"] = Query("csv", alias="format"),
+    chunk_size: int = Query(5_000, ge=1, le=100_000),
+    if_none_match: Optional[str] = Header(None),
+):
+    if fmt == "arrow" and pa is None:
+        raise HTTPException(status_code=400, detail="Arrow export requires pyarrow")
+
+    df = get_ohlcv(
+        ticker=ticker,
+        start=start,
+        end=end,
+        source=source,
+        interval=interval,
+    )
+    if df.empty:
+        raise HTTPException(status_code=400, detail="No data for given parameters")
+
+    bars = _bars_frame(df)
+    key = f"{source}:{ticker.upper()}:{start.isoformat()}:{end.isoformat()}:{interval}:{fmt}"
+    etag = _bars_etag(bars, key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if if_none_match is not None:
+        # Weak comparison (RFC 7232, 3.2): ignore the W/ prefix
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+
+    return StreamingResponse(
+        BAR_WRITERS[fmt](bars, chunk_size),
+        media_type=BAR_MEDIA_TYPES[fmt],
+        headers=headers,
+    )
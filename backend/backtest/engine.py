@@ -8,9 +8,11 @@ class BacktestEngine:
     data: pd.DataFrame
     strategy: object
     initial_capital: float = 10_000.0
+    # Strategies copy before writing; callers sharing read-only data can skip this copy
+    copy_data: bool = True
 
     def run(self) -> pd.DataFrame:
-        df = self.strategy.generate_signals(self.data.copy())
+        df = self.strategy.generate_signals(self.data.copy() if self.copy_data else self.data)
 
         if "Position" not in df.columns:
             raise ValueError("Strategy must produce 'Position' column")
@@ -0,0 +1,77 @@
+from typing import Dict, Iterable, List, Literal, Optional
+
+import numpy as np
+
+from ..data.fetch import get_cached_tails
+
+BAR_FIELDS = ("Close", "High", "Low")
+
+
+def load_universe_tails(
+    n_rows: int,
+    source: Literal["yfinance", "ccxt"] = "yfinance",
+    interval: str = "1d",
+    tickers: Optional[Iterable[str]] = None,
+) -> tuple:
+    """
+    Read the trailing n_rows bars per ticker from the cache.
+
+    Returns (symbols, as_of, bars) where bars maps field -> (n_tickers, n_rows)
+    array, right-aligned and NaN-padded for tickers with shorter history.
+    """
+    tails = get_cached_tails(n_rows, source=source, interval=interval, tickers=tickers)
+
+    # Rows are sorted by ticker then time: scatter them into a right-aligned grid
+    codes, symbols = tails["ticker"].factorize(sort=True)
+    counts = np.bincount(codes, minlength=len(symbols))
+    pos = tails.groupby("ticker", sort=False).cumcount().to_numpy()
+    cols = n_rows - counts[codes] + pos
+
+    bars = {name: np.full((len(symbols), n_rows), np.nan) for name in BAR_FIELDS}
+    for name in BAR_FIELDS:
+        bars[name][codes, cols] = tails[name].to_numpy(dtype=float)
+
+    last_ts = tails.groupby("ticker", sort=True)["timestamp"].max()
+    as_of = [ts.isoformat() for ts in last_ts]
+    return list(symbols), as_of, bars
+
+
+def scan_universe(
+    strategies: Dict[str, object],
+    source: Literal["yfinance", "ccxt"] = "yfinance",
+    interval: str = "1d",
+    tickers: Optional[Iterable[str]] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    Evaluate the latest position of each strategy across the cached universe.
+
+    Only the trailing bars each strategy needs (its `lookback`) are read.
+    Returns strategy name -> list of symbols that are long or just flipped.
+    """
+    if not strategies:
+        return {}
+    n_rows = max(s.lookback for s in strategies.values())
+    symbols, as_of, bars = load_universe_tails(
+        n_rows, source=source, interval=interval, tickers=tickers
+    )
+
+    results: Dict[str, List[Dict]] = {}
+    for name, strategy in strategies.items():
+        if not symbols:
+            results[name] = []
+            continue
+        positions = strategy.last_positions(bars)
+        prev, last = positions[:, 0], positions[:, 1]
+        flipped = prev != last
+        triggered = np.flatnonzero((last > 0) | flipped)
+        results[name] = [
+            {
+                "symbol": symbols[i],
+                "as_of": as_of[i],
+                "position": float(last[i]),
+                "prev_position": float(prev[i]),
+                "flipped": bool(flipped[i]),
+            }
+            for i in triggered
+        ]
+    return results
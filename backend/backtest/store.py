@@ -0,0 +1,290 @@
+import atexit
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from ..data.fetch import CACHE_DIR
+
+# Kept next to the Parquet cache so it lives on the same (shared) volume
+DB_PATH = os.environ.get("EXPERIMENTS_DB", os.path.join(CACHE_DIR, "experiments.sqlite"))
+
+METRIC_COLUMNS = [
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "cagr",
+    "volatility",
+    "win_rate",
+    "profit_factor",
+]
+
+RUN_COLUMNS = [
+    "created_at",
+    "strategy",
+    "ticker",
+    "source",
+    "interval",
+    "start",
+    "end",
+    "params",
+    "initial_capital",
+    "n_bars",
+    "data_fingerprint",
+    *METRIC_COLUMNS,
+]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    strategy TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    source TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start TEXT NOT NULL,
+    "end" TEXT NOT NULL,
+    params TEXT NOT NULL,
+    initial_capital REAL,
+    n_bars INTEGER,
+    data_fingerprint TEXT,
+    {", ".join(f"{m} REAL" for m in METRIC_COLUMNS)}
+);
+CREATE TABLE IF NOT EXISTS run_series (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    labels TEXT,
+    equity TEXT,
+    trades TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_lookup ON runs (strategy, ticker, start, "end");
+CREATE INDEX IF NOT EXISTS idx_runs_ticker ON runs (ticker, start);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at);
+{"".join(f"CREATE INDEX IF NOT EXISTS idx_runs_{m} ON runs ({m});" for m in METRIC_COLUMNS)}
+"""
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Stable content hash of the input bars, to tell runs on different data apart.
+    """
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30.0)
+    # WAL lets readers run while a writer (possibly another worker) commits
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# Writer queue markers: stop the writer / commit the current batch now
+_STOP = None
+_FLUSH = object()
+
+
+class ExperimentStore:
+    """
+    Embedded SQLite store of backtest runs.
+
+    log() only enqueues; a background thread writes records in batched
+    transactions, so logging stays off the backtest hot path.
+    """
+
+    def __init__(self, path: str = DB_PATH, batch_size: int = 500, flush_interval: float = 0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        try:
+            with _connect(path) as conn:
+                conn.executescript(_SCHEMA)
+        except sqlite3.Error:
+            # e.g. locked by another worker; the writer retries on connect
+            pass
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        # Sequence numbers of logged and of written (or dropped) records
+        self._seq = 0
+        self._done_seq = 0
+        self._done = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, name="experiment-store", daemon=True)
+        self._writer.start()
+
+    def log(
+        self,
+        run: Dict[str, Any],
+        metrics: Dict[str, Optional[float]],
+        series: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        record = dict(run)
+        record["created_at"] = time.time()
+        record["params"] = json.dumps(record.get("params") or {}, sort_keys=True)
+        for m in METRIC_COLUMNS:
+            record[m] = metrics.get(m)
+        record["_series"] = series
+        # Numbered under the lock so queue order matches sequence order
+        with self._done:
+            self._seq += 1
+            record["_seq"] = self._seq
+            self._queue.put(record)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until records logged before this call are committed.
+
+        Wakes the writer so it commits its current batch right away instead of
+        waiting out flush_interval, and ignores records logged afterwards.
+        Returns False on timeout, so a stuck writer cannot block readers.
+        """
+        with self._done:
+            target = self._seq
+            if self._done_seq >= target:
+                return True
+            self._queue.put(_FLUSH)
+            return self._done.wait_for(lambda: self._done_seq >= target, timeout=timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+
+    def _write_loop(self) -> None:
+        conn = None
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Collect until the batch is full, the interval ends or a marker arrives
+            while len(batch) < self.batch_size and batch[-1] is not _STOP and batch[-1] is not _FLUSH:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not _STOP and r is not _FLUSH]
+            running = batch[-1] is not _STOP
+            try:
+                if records:
+                    if conn is None:
+                        conn = _connect(self.path)
+                        conn.executescript(_SCHEMA)
+                    self._insert(conn, records)
+            except Exception:
+                # Logging must never break backtests or kill the writer; drop
+                # the batch and reconnect on the next one
+                if conn is not None:
+                    conn.close()
+                conn = None
+            finally:
+                if records:
+                    with self._done:
+                        self._done_seq = records[-1]["_seq"]
+                        self._done.notify_all()
+        if conn is not None:
+            conn.close()
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        columns = ", ".join(f'"{c}"' for c in RUN_COLUMNS)
+        placeholders = ", ".join("?" for _ in RUN_COLUMNS)
+        with conn:
+            conn.executemany(
+                f"INSERT INTO runs ({columns}) VALUES ({placeholders})",
+                [[record.get(c) for c in RUN_COLUMNS] for record in records],
+            )
+            # The transaction holds the write lock, so the batch got consecutive ids
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(records) + 1
+            series_rows = [
+                (
+                    first_id + i,
+                    json.dumps(r["_series"].get("labels")),
+                    json.dumps(r["_series"].get("equity")),
+                    json.dumps(r["_series"].get("trades")),
+                )
+                for i, r in enumerate(records)
+                if r.get("_series")
+            ]
+            if series_rows:
+                conn.executemany(
+                    "INSERT INTO run_series (run_id, labels, equity, trades) VALUES (?, ?, ?, ?)",
+                    series_rows,
+                )
+
+    def query(
+        self,
+        strategy: Optional[str] = None,
+        ticker: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        order_by: str = "sharpe",
+        descending: bool = True,
+        limit: int = 50,
+        include_series: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return runs filtered by strategy/ticker/period, ranked by a metric.
+        """
+        if order_by not in METRIC_COLUMNS and order_by != "created_at":
+            raise ValueError(f"Unknown order_by: {order_by}")
+
+        where = [f"r.{order_by} IS NOT NULL"]
+        args: List[Any] = []
+        if strategy is not None:
+            where.append("r.strategy = ?")
+            args.append(strategy)
+        if ticker is not None:
+            where.append("r.ticker = ?")
+            args.append(ticker.upper())
+        if since is not None:
+            where.append("r.start >= ?")
+            args.append(since)
+        if until is not None:
+            where.append('r."end" <= ?')
+            args.append(until)
+
+        select = "r.*"
+        join = ""
+        if include_series:
+            select += ", s.labels, s.equity, s.trades"
+            join = "LEFT JOIN run_series s ON s.run_id = r.id"
+
+        sql = (
+            f"SELECT {select} FROM runs r {join} WHERE {' AND '.join(where)} "
+            f"ORDER BY r.{order_by} {'DESC' if descending else 'ASC'} LIMIT ?"
+        )
+        args.append(limit)
+
+        conn = _connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(sql, args).fetchall()
+        finally:
+            conn.close()
+
+        result = []
+        for row in rows:
+            item = dict(row)
+            item["params"] = json.loads(item["params"])
+            for key in ("labels", "equity", "trades"):
+                if key in item and item[key] is not None:
+                    item[key] = json.loads(item[key])
+            result.append(item)
+        return result
+
+
+_store: Optional[ExperimentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_experiment_store() -> ExperimentStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ExperimentStore()
+            atexit.register(_store.close)
+        return _store
@@ -1,6 +1,12 @@
+import hashlib
+import io
+import json
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
-from typing import Literal
+from typing import Dict, Iterable, List, Literal, Optional
 
 import pandas as pd
 
@@ -14,10 +20,27 @@ try:
 except ImportError:  # pragma: no cover
     ccxt = None
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+    pq = None
+
+from .filelock import atomic_write_bytes, file_lock
+
 
 CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# Small row groups so tail reads (see _load_tail_from_cache) touch only the end of a file
+CACHE_ROW_GROUP_SIZE = 256
+
+# Bars per ticker kept in the consolidated tail snapshot (see get_cached_tails)
+TAIL_SNAPSHOT_ROWS = 256
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
 
 def _cache_path(
     ticker: str,
@@ -31,11 +54,29 @@ def _cache_path(
     return os.path.join(CACHE_DIR, fname)
 
 
+def _manifest_path(path: str) -> str:
+    return f"{path}.manifest.json"
+
+
+def _read_manifest(path: str) -> Optional[dict]:
+    try:
+        with open(_manifest_path(path), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
 def _load_from_cache(path: str) -> pd.DataFrame:
     if not os.path.exists(path):
         return pd.DataFrame()
     try:
-        df = pd.read_parquet(path)
+        with open(path, "rb") as fh:
+            data = fh.read()
+        manifest = _read_manifest(path)
+        # Files written before manifests existed are accepted as is
+        if manifest is not None and manifest.get("sha256") != hashlib.sha256(data).hexdigest():
+            return pd.DataFrame()
+        df = pd.read_parquet(io.BytesIO(data))
         if not isinstance(df.index, pd.DatetimeIndex):
             df.index = pd.to_datetime(df.index)
         return df
@@ -43,9 +84,54 @@ def _load_from_cache(path: str) -> pd.DataFrame:
         return pd.DataFrame()
 
 
+def _load_tail_from_cache(path: str, n_rows: int) -> pd.DataFrame:
+    """
+    Load only the last n_rows of a cached frame, reading trailing row groups.
+    """
+    if pq is None:
+        return _load_from_cache(path).tail(n_rows)
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    try:
+        pf = pq.ParquetFile(path)
+        # Hashing the whole file would defeat the partial read, so check the
+        # row count; writes are atomic, the manifest guards against mismatches
+        manifest = _read_manifest(path)
+        if manifest is not None and manifest.get("rows") != pf.metadata.num_rows:
+            return pd.DataFrame()
+        groups = []
+        rows = 0
+        for i in reversed(range(pf.metadata.num_row_groups)):
+            groups.append(i)
+            rows += pf.metadata.row_group(i).num_rows
+            if rows >= n_rows:
+                break
+        df = pf.read_row_groups(sorted(groups), use_pandas_metadata=True).to_pandas()
+        if not isinstance(df.index, pd.DatetimeIndex):
+            df.index = pd.to_datetime(df.index)
+        return df.tail(n_rows)
+    except Exception:
+        return pd.DataFrame()
+
+
 def _save_to_cache(df: pd.DataFrame, path: str) -> None:
+    """
+    Atomically write the frame and its manifest (checksum, rows, time).
+
+    Callers should hold file_lock(path) so only one writer runs per key.
+    """
     try:
-        df.to_parquet(path)
+        buf = io.BytesIO()
+        df.to_parquet(buf, row_group_size=CACHE_ROW_GROUP_SIZE)
+        data = buf.getvalue()
+        manifest = {
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "rows": len(df),
+            "bytes": len(data),
+            "written_at": time.time(),
+        }
+        atomic_write_bytes(path, data)
+        atomic_write_bytes(_manifest_path(path), json.dumps(manifest).encode("utf-8"))
     except Exception:
         pass
 
@@ -122,6 +208,30 @@ def _fetch_ccxt(
     return df[["Open", "High", "Low", "Close", "Volume"]]
 
 
+def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop the ticker level from yfinance (field, ticker) MultiIndex columns.
+    """
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+def _fetch(
+    ticker: str,
+    start: date,
+    end: date,
+    source: str,
+    interval: str,
+) -> pd.DataFrame:
+    if source == "yfinance":
+        return _fetch_yfinance(ticker, start, end, interval)
+    if source == "ccxt":
+        return _fetch_ccxt(ticker, start, end, interval)
+    raise ValueError(f"Unknown data source: {source}")
+
+
 def get_ohlcv(
     ticker: str,
     start: date,
@@ -134,20 +244,165 @@ def get_ohlcv(
     """
     path = _cache_path(ticker=ticker, start=start, end=end, source=source, interval=interval)
     df = _load_from_cache(path)
-    if not df.empty:
-        # Filter to exact period
-        df = df.loc[(df.index.date >= start) & (df.index.date <= end)]
-        return df
+    if df.empty:
+        # One process fetches per key; the others block here, then hit the cache
+        with file_lock(path):
+            df = _load_from_cache(path)
+            if df.empty:
+                df = _fetch(ticker, start, end, source, interval)
+                if not df.empty:
+                    _save_to_cache(df, path)
+                return df
 
-    if source == "yfinance":
-        df = _fetch_yfinance(ticker, start, end, interval)
-    elif source == "ccxt":
-        df = _fetch_ccxt(ticker, start, end, interval)
-    else:
-        raise ValueError(f"Unknown data source: {source}")
+    # Cache hit (possibly written by another worker): filter to exact period
+    df = df.loc[(df.index.date >= start) & (df.index.date <= end)]
+    return df
+
+
+def latest_cache_paths(
+    source: Literal["yfinance", "ccxt"] = "yfinance",
+    interval: str = "1d",
+    tickers: Optional[Iterable[str]] = None,
+) -> Dict[str, str]:
+    """
+    Map ticker -> cache file with the most recent end date.
+    """
+    pattern = re.compile(
+        rf"^{re.escape(source)}_(?P<ticker>.+)_(?P<start>\d{{4}}-\d{{2}}-\d{{2}})"
+        rf"_(?P<end>\d{{4}}-\d{{2}}-\d{{2}})_{re.escape(interval)}\.parquet$"
+    )
+    wanted = None
+    if tickers is not None:
+        wanted = {t.replace("/", "_").upper(): t for t in tickers}
+
+    best: Dict[str, tuple] = {}
+    for fname in os.listdir(CACHE_DIR):
+        m = pattern.match(fname)
+        if m is None:
+            continue
+        safe_ticker = m.group("ticker")
+        if wanted is not None and safe_ticker not in wanted:
+            continue
+        ticker = wanted[safe_ticker] if wanted is not None else safe_ticker
+        # ISO dates compare correctly as strings
+        rank = (m.group("end"), m.group("start"))
+        if ticker not in best or rank > best[ticker][0]:
+            best[ticker] = (rank, os.path.join(CACHE_DIR, fname))
+    return {ticker: path for ticker, (_, path) in best.items()}
+
+
+def _tail_snapshot_path(source: str, interval: str) -> str:
+    # Leading underscore keeps it out of latest_cache_paths
+    return os.path.join(CACHE_DIR, f"_tails_{source}_{interval}.parquet")
+
+
+def _file_stamp(path: str) -> List:
+    st = os.stat(path)
+    return [os.path.basename(path), st.st_mtime_ns, st.st_size]
+
+
+def _read_tail_snapshot(path: str) -> tuple:
+    empty = pd.DataFrame(columns=["ticker", "timestamp", *OHLCV_COLUMNS])
+    if pq is None or not os.path.exists(path):
+        return empty, {"rows": 0, "files": {}}
+    try:
+        table = pq.read_table(path)
+        meta = json.loads(table.schema.metadata[b"tail_snapshot"])
+        return table.to_pandas(), meta
+    except Exception:
+        return empty, {"rows": 0, "files": {}}
 
-    if not df.empty:
-        _save_to_cache(df, path)
+
+def _write_tail_snapshot(path: str, df: pd.DataFrame, meta: dict) -> None:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"tail_snapshot": json.dumps(meta).encode("utf-8")}
+    )
+    buf = io.BytesIO()
+    pq.write_table(table, buf)
+    atomic_write_bytes(path, buf.getvalue())
+
+
+def _tail_rows(ticker: str, path: str, n_rows: int) -> pd.DataFrame:
+    df = flatten_columns(_load_tail_from_cache(path, n_rows))
+    if df.empty:
+        return pd.DataFrame()
+    df = df.reindex(columns=OHLCV_COLUMNS).astype(float)
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    df = df.set_axis(index).rename_axis("timestamp").reset_index()
+    df.insert(0, "ticker", ticker)
     return df
 
 
+def _refresh_tail_snapshot(
+    snapshot_path: str,
+    paths: Dict[str, str],
+    stamps: Dict[str, List],
+    n_rows: int,
+) -> pd.DataFrame:
+    with file_lock(snapshot_path):
+        # Another worker may have refreshed it while we waited
+        df, meta = _read_tail_snapshot(snapshot_path)
+        depth = max(n_rows, TAIL_SNAPSHOT_ROWS)
+        if meta["rows"] < depth:
+            meta = {"rows": depth, "files": {}}
+        stale = [t for t in stamps if meta["files"].get(t) != stamps[t]]
+        removed = set(meta["files"]) - set(stamps)
+        if not stale and not removed:
+            return df
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            fresh = list(pool.map(lambda t: _tail_rows(t, paths[t], depth), stale))
+        drop = set(stale) | removed
+        kept = df.loc[~df["ticker"].isin(drop)] if meta["files"] else df.iloc[:0]
+        df = pd.concat([kept, *[f for f in fresh if not f.empty]], ignore_index=True)
+        df = df.sort_values(["ticker", "timestamp"], kind="stable", ignore_index=True)
+
+        meta["files"] = stamps
+        try:
+            _write_tail_snapshot(snapshot_path, df, meta)
+        except Exception:
+            pass
+        return df
+
+
+def get_cached_tails(
+    n_rows: int,
+    source: Literal["yfinance", "ccxt"] = "yfinance",
+    interval: str = "1d",
+    tickers: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Last n_rows bars of every cached ticker as one long frame.
+
+    Columns are ticker, timestamp (naive UTC) and OHLCV, sorted by ticker and
+    time. Tickers are spelled as passed in `tickers`, or with "/" restored. Served from a consolidated per-(source, interval) snapshot that is
+    re-read from the per-key cache files only for tickers whose latest file
+    changed, so a scan reads one file instead of one per ticker.
+    """
+    paths = latest_cache_paths(source=source, interval=interval)
+    stamps = {}
+    for ticker, path in paths.items():
+        try:
+            stamps[ticker] = _file_stamp(path)
+        except OSError:
+            continue
+
+    snapshot_path = _tail_snapshot_path(source, interval)
+    df, meta = _read_tail_snapshot(snapshot_path)
+    if meta["rows"] < n_rows or meta["files"] != stamps:
+        df = _refresh_tail_snapshot(snapshot_path, paths, stamps, n_rows)
+
+    if tickers is not None:
+        # Report the caller's spelling, not the cache-file form
+        symbols = {t.replace("/", "_").upper(): t for t in tickers}
+        df = df.loc[df["ticker"].isin(symbols)]
+    else:
+        # Undo the "/" -> "_" mangling of _cache_path (e.g. ccxt BTC/USDT)
+        symbols = {t: t.replace("_", "/") for t in df["ticker"].unique()}
+    df = df.groupby("ticker", sort=False).tail(n_rows)
+    # Map the few distinct names rather than every row
+    codes, names = df["ticker"].factorize()
+    return df.assign(ticker=names.map(symbols).to_numpy()[codes])
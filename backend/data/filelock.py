@@ -0,0 +1,56 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows, no cross-process locking
+    fcntl = None
+
+# Read once at import: os.umask can only be queried by setting it, which is not thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False) -> Iterator[None]:
+    """
+    Advisory lock on a sidecar "<path>.lock" file, shared between processes.
+
+    Blocks until the lock is acquired. Exclusive by default.
+    """
+    with open(f"{path}.lock", "a+") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    """
+    Write data to a temp file in the same directory, then rename over path.
+
+    Readers see either the previous file or the complete new one, never a
+    partially written file.
+    """
+    dirname, basename = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=f".{basename}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        # mkstemp creates 0600; use regular umask-based permissions so other
+        # containers sharing the cache volume can read the file
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 class Breakout:
@@ -10,6 +12,8 @@ class Breakout:
     """
 
     def __init__(self, window: int = 20):
+        if window < 1:
+            raise ValueError("window must be at least 1")
         self.window = window
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -38,4 +42,25 @@ class Breakout:
         df["Position"] = df["Signal"].ffill().fillna(0)
         return df
 
+    @property
+    def lookback(self) -> int:
+        # window ending on the previous bar, for each of the last two bars
+        return self.window + 2
 
+    def last_positions(self, bars: dict) -> np.ndarray:
+        """
+        Vectorized positions for the last two bars of many tickers.
+
+        bars["High"], bars["Low"], bars["Close"] are (n_tickers, lookback)
+        arrays; returns (n_tickers, 2) with [previous, latest] position,
+        matching generate_signals.
+        """
+        high = bars["High"][:, -self.lookback :]
+        low = bars["Low"][:, -self.lookback :]
+        close = bars["Close"][:, -2:]
+
+        # Rolling extremes for the bars before the last two (i.e. shift(1))
+        high_max = sliding_window_view(high, self.window, axis=1).max(axis=-1)[:, :-1]
+        low_min = sliding_window_view(low, self.window, axis=1).min(axis=-1)[:, :-1]
+
+        return np.where(close < low_min, 0.0, np.where(close > high_max, 1.0, 0.0))
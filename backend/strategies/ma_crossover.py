@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 class MACrossover:
@@ -10,6 +12,8 @@ class MACrossover:
     """
 
     def __init__(self, fast: int = 20, slow: int = 50):
+        if fast < 1:
+            raise ValueError("fast period must be at least 1")
         if fast >= slow:
             raise ValueError("fast period must be less than slow period")
         self.fast = fast
@@ -33,4 +37,19 @@ class MACrossover:
         df["Position"] = df["Signal"]
         return df
 
-
+    @property
+    def lookback(self) -> int:
+        # slow MA for the last bar plus one bar to detect a flip
+        return self.slow + 1
+
+    def last_positions(self, bars: dict) -> np.ndarray:
+        """
+        Vectorized positions for the last two bars of many tickers.
+
+        bars["Close"] is a (n_tickers, lookback) array; returns (n_tickers, 2)
+        with [previous, latest] position, matching generate_signals.
+        """
+        close = bars["Close"][:, -self.lookback :]
+        ma_fast = sliding_window_view(close[:, -(self.fast + 1) :], self.fast, axis=1).mean(axis=-1)
+        ma_slow = sliding_window_view(close, self.slow, axis=1).mean(axis=-1)
+        return np.nan_to_num(np.sign(ma_fast - ma_slow))
@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 class MeanReversion:
@@ -10,6 +12,8 @@ class MeanReversion:
     """
 
     def __init__(self, window: int = 20, std_k: float = 2.0):
+        if window < 1:
+            raise ValueError("window must be at least 1")
         self.window = window
         self.std_k = std_k
 
@@ -35,4 +39,22 @@ class MeanReversion:
         df["Position"] = df["Signal"].ffill().fillna(0)
         return df
 
-
+    @property
+    def lookback(self) -> int:
+        # one full window for the last bar plus one bar to detect a flip
+        return self.window + 1
+
+    def last_positions(self, bars: dict) -> np.ndarray:
+        """
+        Vectorized positions for the last two bars of many tickers.
+
+        bars["Close"] is a (n_tickers, lookback) array; returns (n_tickers, 2)
+        with [previous, latest] position, matching generate_signals.
+        """
+        close = bars["Close"][:, -self.lookback :]
+        windows = sliding_window_view(close, self.window, axis=1)
+        sma = windows.mean(axis=-1)
+        std = windows.std(axis=-1, ddof=1)
+        lower_band = sma - self.std_k * std
+        last_close = close[:, -2:]
+        return np.where(last_close > sma, 0.0, np.where(last_close < lower_band, 1.0, 0.0))
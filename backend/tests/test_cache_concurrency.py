@@ -0,0 +1,74 @@
+import multiprocessing as mp
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.data import fetch, filelock
+
+START = date(2020, 1, 1)
+END = date(2020, 12, 31)
+N_ROWS = 2_000
+
+
+def _fake_fetch(ticker, start, end, source, interval):
+    # Record the fetch, then stay slow enough for the other workers to pile up
+    with open(os.environ["FETCH_LOG"], "a") as fh:
+        fh.write(f"{ticker}\n")
+    time.sleep(0.05)
+    index = pd.date_range(start, end, periods=N_ROWS)
+    close = np.linspace(1.0, 2.0, N_ROWS)
+    return pd.DataFrame(
+        {"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0},
+        index=index,
+    )
+
+
+def _load(ticker):
+    return len(fetch.get_ohlcv(ticker, START, END))
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(fetch, "_fetch", _fake_fetch)
+    monkeypatch.setenv("FETCH_LOG", str(tmp_path / "fetches.log"))
+    return tmp_path
+
+
+@pytest.mark.skipif(filelock.fcntl is None, reason="needs fcntl.flock")
+def test_one_fetch_per_key_under_load(cache_dir):
+    tickers = [f"T{i % 5}" for i in range(200)]
+
+    # fork so workers inherit the monkeypatched module state
+    with mp.get_context("fork").Pool(32) as pool:
+        sizes = pool.map(_load, tickers)
+
+    with open(cache_dir / "fetches.log") as fh:
+        fetched = fh.read().split()
+    assert sorted(fetched) == sorted(set(tickers))
+    # Nobody saw a partially written file
+    assert set(sizes) == {N_ROWS}
+
+
+def test_checksum_mismatch_is_a_miss(cache_dir):
+    assert _load("AAA") == N_ROWS
+    path = fetch._cache_path("AAA", START, END, "yfinance", "1d")
+    with open(path, "r+b") as fh:
+        fh.seek(100)
+        fh.write(b"\0" * 16)
+
+    assert fetch._load_from_cache(path).empty
+
+
+def test_tail_read_checks_manifest_rows(cache_dir):
+    assert _load("BBB") == N_ROWS
+    path = fetch._cache_path("BBB", START, END, "yfinance", "1d")
+    assert len(fetch._load_tail_from_cache(path, 10)) == 10
+
+    with open(fetch._manifest_path(path), "w") as fh:
+        fh.write('{"rows": 1}')
+    assert fetch._load_tail_from_cache(path, 10).empty
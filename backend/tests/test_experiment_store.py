@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from backend.backtest.store import ExperimentStore
+
+RUN = {
+    "strategy": "breakout",
+    "ticker": "SPY",
+    "source": "yfinance",
+    "interval": "1d",
+    "start": "2021-01-01",
+    "end": "2024-01-01",
+    "params": {"window": 20},
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = ExperimentStore(str(tmp_path / "experiments.sqlite"), flush_interval=0.01)
+    yield s
+    s.close()
+
+
+def test_writer_survives_failed_batch(store, monkeypatch):
+    original = ExperimentStore.__dict__["_insert"]
+
+    def broken(conn, records):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(ExperimentStore, "_insert", staticmethod(broken))
+    store.log(RUN, {"sharpe": 1.0})
+    assert store.flush(timeout=2.0)
+    assert store._writer.is_alive()
+
+    monkeypatch.setattr(ExperimentStore, "_insert", original)
+    store.log(RUN, {"sharpe": 2.0})
+    assert store.flush(timeout=2.0)
+    assert [r["sharpe"] for r in store.query()] == [2.0]
+
+
+def test_flush_times_out_on_stuck_writer(store, monkeypatch):
+    monkeypatch.setattr(ExperimentStore, "_insert", staticmethod(lambda conn, records: time.sleep(1.0)))
+    store.log(RUN, {"sharpe": 1.0})
+    started = time.monotonic()
+    assert not store.flush(timeout=0.1)
+    assert time.monotonic() - started < 0.5
+
+
+def test_batch_insert_links_series_to_runs(store):
+    for i in range(50):
+        series = {"labels": [str(i)], "equity": [float(i)], "trades": []} if i % 3 == 0 else None
+        store.log({**RUN, "params": {"window": i}}, {"sharpe": float(i)}, series=series)
+    assert store.flush(timeout=5.0)
+
+    rows = store.query(limit=100, include_series=True)
+    assert len(rows) == 50
+    for row in rows:
+        window = row["params"]["window"]
+        if window % 3 == 0:
+            assert row["equity"] == [float(window)]
+        else:
+            assert row["equity"] is None
+
+
+def test_flush_does_not_wait_out_flush_interval(tmp_path):
+    store = ExperimentStore(str(tmp_path / "experiments.sqlite"), flush_interval=0.5)
+    try:
+        store.log(RUN, {"sharpe": 1.0})
+        started = time.monotonic()
+        assert store.flush(timeout=2.0)
+        assert time.monotonic() - started < 0.2
+        assert len(store.query()) == 1
+    finally:
+        store.close()
+
+
+def test_flush_ignores_runs_logged_afterwards(tmp_path):
+    store = ExperimentStore(str(tmp_path / "experiments.sqlite"), flush_interval=0.5)
+    stop = threading.Event()
+
+    def sweep():
+        while not stop.is_set():
+            store.log(RUN, {"sharpe": 0.5})
+            time.sleep(0.001)
+
+    worker = threading.Thread(target=sweep)
+    worker.start()
+    try:
+        for _ in range(5):
+            started = time.monotonic()
+            assert store.flush(timeout=2.0)
+            assert time.monotonic() - started < 0.2
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        worker.join()
+        store.close()
@@ -0,0 +1,100 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.backtest.scanner import scan_universe
+from backend.data import fetch
+from backend.strategies.breakout import Breakout
+from backend.strategies.ma_crossover import MACrossover
+from backend.strategies.mean_reversion import MeanReversion
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(fetch, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _rising_frame(n_rows=100):
+    index = pd.bdate_range("2020-01-01", periods=n_rows)
+    close = np.linspace(1.0, 2.0, n_rows)
+    return pd.DataFrame(
+        {"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1.0},
+        index=index,
+    )
+
+
+def test_scan_reports_caller_symbols(cache_dir):
+    path = fetch._cache_path("BTC/USDT", date(2020, 1, 1), date(2020, 6, 1), "ccxt", "1d")
+    fetch._save_to_cache(_rising_frame(), path)
+    strategies = {"ma": MACrossover(fast=5, slow=20)}
+
+    found = scan_universe(strategies, source="ccxt")["ma"]
+    assert [r["symbol"] for r in found] == ["BTC/USDT"]
+
+    found = scan_universe(strategies, source="ccxt", tickers=["btc/usdt"])["ma"]
+    assert [r["symbol"] for r in found] == ["btc/usdt"]
+
+
+STRATEGIES = [
+    MACrossover(fast=3, slow=10),
+    MACrossover(fast=20, slow=50),
+    MeanReversion(window=3, std_k=0.5),
+    MeanReversion(window=5, std_k=0.5),
+    MeanReversion(window=20, std_k=2.0),
+    Breakout(window=4),
+    Breakout(window=20),
+]
+
+
+def _random_frame(rng, n_rows, multiindex=False):
+    index = pd.bdate_range("2020-01-01", periods=n_rows)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_rows)))
+    df = pd.DataFrame(
+        {
+            "Open": close,
+            "High": close * (1 + rng.uniform(0, 0.02, n_rows)),
+            "Low": close * (1 - rng.uniform(0, 0.02, n_rows)),
+            "Close": close,
+            "Volume": 1.0,
+        },
+        index=index,
+    )
+    if multiindex:
+        # yfinance-style (field, ticker) columns
+        df.columns = pd.MultiIndex.from_product([df.columns, ["XYZ"]])
+    return df
+
+
+def _trailing_bars(df, n_rows):
+    # Right-aligned, NaN-padded like scanner.load_universe_tails
+    bars = {}
+    for name in ("Close", "High", "Low"):
+        values = df[name]
+        if isinstance(values, pd.DataFrame):
+            values = values.iloc[:, 0]
+        values = values.to_numpy(dtype=float)[-n_rows:]
+        row = np.full(n_rows, np.nan)
+        row[n_rows - len(values) :] = values
+        bars[name] = row[None, :]
+    return bars
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES, ids=lambda s: f"{type(s).__name__}-{s.lookback}")
+@pytest.mark.parametrize("multiindex", [False, True])
+def test_last_positions_match_generate_signals(strategy, multiindex):
+    rng = np.random.default_rng(strategy.lookback)
+    lookback = strategy.lookback
+    # Shorter than, equal to and longer than the lookback
+    lengths = [2, lookback - 1, lookback, lookback + 1, lookback + 200]
+    for n_rows in lengths * 10:
+        df = _random_frame(rng, n_rows, multiindex=multiindex)
+        position = strategy.generate_signals(df)["Position"]
+        if isinstance(position, pd.DataFrame):
+            position = position.iloc[:, 0]
+        expected = position.to_numpy(dtype=float)[-2:]
+
+        actual = strategy.last_positions(_trailing_bars(df, lookback))[0]
+        np.testing.assert_array_equal(actual, expected, err_msg=f"n_rows={n_rows}")